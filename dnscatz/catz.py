@@ -1,29 +1,52 @@
 import contextlib
+import functools
 import logging
 import os
 import re
+import threading
 import time
-from collections import defaultdict
+from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+import dns.exception
+import dns.inet
+import dns.message
+import dns.name
 import dns.query
 import dns.rdataclass
+import dns.rdataset
 import dns.rdatatype
 import dns.resolver
-import dns.tsig
 import dns.tsigkeyring
 import dns.xfr
 import dns.zone
 
 SUPPORTED_VERSIONS = [2]
+VERSION_RE = re.compile(r"\"(\d+)\"")
+
+VERSION_LABEL = b"version"
+ZONES_LABEL = b"zones"
+UNSUPPORTED_PROPERTIES = {
+    b"group": "Group",
+    b"coo": "Change of Ownership",
+    b"serial": "Serial",
+}
+
+MASTER_CACHE_MAX_TTL = 3600
+SOA_QUERY_TIMEOUT = 2
+ZONEFILE_BUFFER_SIZE = 1024 * 1024
 
 logger = logging.getLogger(__name__)
 
+_master_cache: Dict[str, Tuple[str, float]] = {}
+_master_cache_lock = threading.Lock()
+
 
 @dataclass(frozen=True)
 class CatalogZone:
     origin: str
+    # member zone names, lowercase and without trailing dot
     zones: Set[str]
     pattern: Optional[str] = None
 
@@ -68,34 +91,133 @@ def parse_config_catalog_zone(
             keyalgorithm = keys[keyname].keyalgorithm
             secret = keys[keyname].secret
 
-        zone = None
         if zonefile := zone_dict.get("zonefile"):
             zonefile = os.path.join(cwd, zonefile) if cwd else zonefile
+            zone = None
+            serial = None
             with contextlib.suppress(FileNotFoundError):
                 zone = dns.zone.from_file(zonefile, origin=name)
+                serial = get_zone_serial(zone)
+            zone = axfr(
+                origin=name,
+                master=master,
+                keyname=keyname,
+                keyalgorithm=keyalgorithm,
+                secret=secret,
+                zone=zone,
+            )
+            if get_zone_serial(zone) != serial:
+                write_zonefile(zone, zonefile)
+            zones = get_catz_zones(zone)
         else:
-            zonefile = None
-
-        zone = axfr(
-            origin=name,
-            master=master,
-            keyname=keyname,
-            keyalgorithm=keyalgorithm,
-            secret=secret,
-            zone=zone,
-        )
-
-        if zonefile:
-            zone.to_file(zonefile, want_origin=True)
+            # no zone to keep, collect member zones while transferring
+            zones = xfr_catz_zones(
+                origin=name,
+                master=master,
+                keyname=keyname,
+                keyalgorithm=keyalgorithm,
+                secret=secret,
+            )
     elif zonefile := zone_dict.get("zonefile"):
         zonefile = os.path.join(cwd, zonefile) if cwd else zonefile
         zone = dns.zone.from_file(zonefile, origin=name)
+        zones = get_catz_zones(zone)
     else:
         raise InvalidConfigurationError(
             f"Either request-xfr or zonefile must be specified for {name}"
         )
 
-    return CatalogZone(origin=name, pattern=pattern, zones=get_catz_zones(zone))
+    return CatalogZone(origin=name, pattern=pattern, zones=zones)
+
+
+@functools.cache
+def get_resolver() -> dns.resolver.Resolver:
+    """Get shared resolver, configured on first use"""
+    return dns.resolver.Resolver(configure=True)
+
+
+def get_zone_serial(zone: dns.zone.Zone) -> int:
+    """Get SOA serial of zone"""
+    return zone.get_rdataset(zone.origin, dns.rdatatype.SOA)[0].serial
+
+
+def write_zonefile(zone: dns.zone.Zone, filename: str) -> None:
+    """Write zone to file, serialized in memory and written at once"""
+    data = zone.to_text(want_origin=True)
+    with open(filename, "w", buffering=ZONEFILE_BUFFER_SIZE) as fp:
+        fp.write(data)
+
+
+def resolve_master(master: str) -> str:
+    """Resolve master name to address, caching the result for the answer TTL"""
+    if dns.inet.is_address(master):
+        return master
+
+    with _master_cache_lock:
+        if cached := _master_cache.get(master):
+            address, expiry = cached
+            if time.monotonic() < expiry:
+                return address
+
+    try:
+        answer = resolve_address(master)
+    except dns.exception.DNSException as exc:
+        raise CatalogZoneError(f"Failed to resolve master {master}: {exc}") from exc
+    address = answer[0].address
+    expiry = time.monotonic() + min(answer.rrset.ttl, MASTER_CACHE_MAX_TTL)
+    logger.debug("Resolved master %s to %s", master, address)
+
+    with _master_cache_lock:
+        _master_cache[master] = (address, expiry)
+
+    return address
+
+
+def resolve_address(name: str) -> dns.resolver.Answer:
+    """Resolve name to IPv4 address, falling back to IPv6"""
+    resolver = get_resolver()
+    try:
+        return resolver.resolve(name, "A")
+    except dns.resolver.NoAnswer:
+        return resolver.resolve(name, "AAAA")
+
+
+@functools.lru_cache(maxsize=32)
+def get_tsig_keyring(
+    keyname: Optional[str], keyalgorithm: Optional[str], secret: Optional[str]
+) -> Tuple[Optional[dict], Optional[dns.name.Name]]:
+    """Get TSIG keyring and algorithm name, or None if no key is used"""
+    if keyname and keyalgorithm and secret:
+        return (
+            dns.tsigkeyring.from_text({keyname: secret}),
+            dns.name.from_text(keyalgorithm),
+        )
+    return (None, None)
+
+
+def query_soa_serial(
+    origin: str,
+    where: str,
+    keyring: Optional[dict],
+    keyname: Optional[str],
+    keyalgorithm: Optional[dns.name.Name],
+) -> Optional[int]:
+    """Query SOA serial over UDP, return None if not available"""
+    query = dns.message.make_query(origin, dns.rdatatype.SOA)
+    if keyring:
+        query.use_tsig(keyring, keyname=keyname, algorithm=keyalgorithm)
+    try:
+        response = dns.query.udp(query, where, timeout=SOA_QUERY_TIMEOUT)
+    except (dns.exception.DNSException, OSError) as exc:
+        logger.debug("SOA query for zone %s failed: %s", origin, exc)
+        return None
+    rrset = response.get_rrset(
+        response.answer,
+        query.question[0].name,
+        dns.rdataclass.IN,
+        dns.rdatatype.SOA,
+    )
+    return rrset[0].serial if rrset else None
 
 
 def axfr(
@@ -107,28 +229,51 @@ def axfr(
     zone: Optional[dns.zone.Zone] = None,
 ) -> Optional[dns.zone.Zone]:
     """Perform zone transfer"""
-    if keyname and keyalgorithm and secret:
-        keyring = dns.tsigkeyring.from_text({keyname: secret})
-        keyalgorithm = dns.name.from_text(keyalgorithm)
-    else:
-        keyring = None
-        keyalgorithm = None
+    keyring, keyalgorithm = get_tsig_keyring(keyname, keyalgorithm, secret)
+    where = resolve_master(master)
 
     if zone is not None:
-        serial = zone.get_rdataset(zone.origin, dns.rdatatype.SOA)[0].serial
-        (query, new_serial) = dns.xfr.make_query(
+        (query, serial) = dns.xfr.make_query(
             zone,
-            serial=serial,
             keyring=keyring,
             keyname=keyname,
             keyalgorithm=keyalgorithm,
         )
-        if serial == new_serial:
+        if query_soa_serial(origin, where, keyring, keyname, keyalgorithm) == serial:
             logger.debug("Zone %s not changed", origin)
             return zone
+        t1 = time.perf_counter()
+        try:
+            dns.query.inbound_xfr(where, zone, query=query)
+        except dns.xfr.SerialWentBackwards:
+            logger.warning(
+                "Zone %s serial went backwards, falling back to AXFR", origin
+            )
+        except dns.xfr.TransferError as exc:
+            logger.warning(
+                "Zone %s IXFR failed (%s), falling back to AXFR", origin, exc
+            )
+        else:
+            t2 = time.perf_counter()
+            new_serial = get_zone_serial(zone)
+            if serial == new_serial:
+                logger.debug("Zone %s not changed", origin)
+            else:
+                logger.debug(
+                    "Zone %s updated from serial %d to %d in %.3f seconds",
+                    origin,
+                    serial,
+                    new_serial,
+                    t2 - t1,
+                )
+            return zone
 
     m = dns.query.xfr(
-        master, origin, keyname=keyname, keyring=keyring, keyalgorithm=keyalgorithm
+        where,
+        origin,
+        keyname=keyname,
+        keyring=keyring,
+        keyalgorithm=keyalgorithm,
     )
 
     t1 = time.perf_counter()
@@ -139,28 +284,76 @@ def axfr(
     return zone
 
 
+def xfr_catz_zones(
+    origin: str,
+    master: str,
+    keyname: Optional[str],
+    keyalgorithm: Optional[str],
+    secret: Optional[str],
+) -> Set[str]:
+    """Get zones from catalog zone transfer without building the zone"""
+    keyring, keyalgorithm = get_tsig_keyring(keyname, keyalgorithm, secret)
+
+    m = dns.query.xfr(
+        resolve_master(master),
+        origin,
+        keyname=keyname,
+        keyring=keyring,
+        keyalgorithm=keyalgorithm,
+    )
+
+    t1 = time.perf_counter()
+    zones = get_catz_rdatasets_zones(
+        dns.name.from_text(origin),
+        ((rrset.name, rrset) for message in m for rrset in message.answer),
+    )
+    t2 = time.perf_counter()
+    logger.debug("Zone %s transferred in %.3f seconds", origin, t2 - t1)
+
+    return zones
+
+
 def get_catz_zones(catalog_zone: dns.zone.Zone) -> Set[str]:
     """Get zones from catalog zone"""
+    return get_catz_rdatasets_zones(
+        catalog_zone.origin, catalog_zone.iterate_rdatasets()
+    )
+
+
+def get_catz_rdatasets_zones(
+    origin: dns.name.Name,
+    rdatasets: Iterable[Tuple[dns.name.Name, dns.rdataset.Rdataset]],
+) -> Set[str]:
+    """Get zones from catalog zone (name, rdataset) pairs"""
     zones = set()
-    for k, v in catalog_zone.nodes.items():
-        if str(k) == "version":
-            if rdataset := v.get_rdataset(dns.rdataclass.IN, dns.rdatatype.TXT):
+    unsupported: Counter = Counter()
+    for k, rdataset in rdatasets:
+        labels = k.labels
+        if len(labels) == 1 and labels[0].lower() == VERSION_LABEL:
+            if rdataset.rdtype == dns.rdatatype.TXT:
                 catz_version = get_catz_version(rdataset[0])
                 if catz_version not in SUPPORTED_VERSIONS:
                     raise CatalogZoneError(
                         f"Unsupported catalog zone version ({catz_version})"
                     )
-        elif str(k).startswith("group."):
-            logging.info("Group property not supported: %s", str(k))
-        elif str(k).startswith("coo."):
-            logging.info("Change of Ownership property not supported: %s", str(k))
-        elif str(k).startswith("serial."):
-            logging.info("Serial property not supported: %s", str(k))
-        elif str(k).endswith(".zones"):
-            rdataset = v.get_rdataset(dns.rdataclass.IN, dns.rdatatype.PTR)
+        elif len(labels) < 2 or labels[-1].lower() != ZONES_LABEL:
+            continue
+        elif len(labels) == 2:
+            # <unique-id>.zones
+            if rdataset.rdtype != dns.rdatatype.PTR:
+                continue
             if len(rdataset) != 1:
                 raise CatalogZoneError("Broken catalog zone (PTR)")
-            zones.add(str(rdataset[0]).rstrip("."))
+            # targets below the catalog zone origin are relative
+            target = rdataset[0].target.derelativize(origin)
+            zones.add(target.to_text(omit_final_dot=True).lower())
+        elif len(labels) == 3:
+            # <property>.<unique-id>.zones
+            if prop := UNSUPPORTED_PROPERTIES.get(labels[0].lower()):
+                logger.debug("%s property not supported: %s", prop, k)
+                unsupported[prop] += 1
+    for prop, count in unsupported.items():
+        logger.info("%s property not supported (%d found)", prop, count)
     return zones
 
 
@@ -168,20 +361,21 @@ def get_catz_version(rr) -> Optional[int]:
     """Get catalog zone version from TXT RR"""
     if rr.rdtype != dns.rdatatype.TXT:
         raise ValueError("Invalid rdatatype for catalog zone version")
-    if match := re.fullmatch(r"\"(\d+)\"", str(rr)):
+    if match := VERSION_RE.fullmatch(str(rr)):
         return int(match.group(1))
 
 
 def ensure_unique_zones(catalog_zones: List[CatalogZone]):
     """Ensure zones are not defined in multiple catalogs"""
-    zone2catalogs = defaultdict(set)
+    zone2catalog: Dict[str, str] = {}
+    errors = 0
     for cz in catalog_zones:
         for zone in cz.zones:
-            zone2catalogs[zone].add(cz.origin)
-    errors = 0
-    for zone, catalogs in zone2catalogs.items():
-        if len(catalogs) > 1:
-            logger.error("%s defined in multiple catalogs: %s", zone, catalogs)
-            errors += 1
+            catalog = zone2catalog.setdefault(zone, cz.origin)
+            if catalog != cz.origin:
+                logger.error(
+                    "%s defined in multiple catalogs: %s", zone, {catalog, cz.origin}
+                )
+                errors += 1
     if errors:
         raise InvalidConfigurationError("Duplicate zones found in catalogs")
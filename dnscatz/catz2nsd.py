@@ -5,7 +5,7 @@ Config file syntax:
 
 catalog-zone:
   name: <string>
-  request-xfr: <ip-address> <key-name | NOKEY>
+  request-xfr: <ip-address | hostname> <key-name | NOKEY>
   zonefile: <filename>
   pattern: <pattern-name>
 
@@ -16,12 +16,13 @@ key:
 """
 
 import argparse
+import concurrent.futures
 import contextlib
 import logging
-import os
 import re
+import subprocess
 import sys
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from .catz import (
     TSIG,
@@ -35,6 +36,11 @@ from .utils import read_multidicts
 
 DEFAULT_CONFIG = "/etc/nsd/catz2nsd.conf"
 DEFAULT_ZONELIST = "/var/lib/nsd/zone.list"
+MAX_WORKERS = 32
+NSD_CONTROL_WORKERS = 8
+ZONELIST_BUFFER_SIZE = 1024 * 1024
+
+ADD_ZONE_RE = re.compile(r"^add (\S+) (\w+)\s*$")
 
 
 logger = logging.getLogger(__name__)
@@ -63,31 +69,106 @@ def parse_config(
             name = zone_dict["name"]
             if name in zones:
                 raise InvalidConfigurationError(f"Duplicate catalog-zone {name} found")
-            catalog_zone = parse_config_catalog_zone(zone_dict, keys, cwd)
-            zones[catalog_zone.origin] = catalog_zone
+            zones[name] = zone_dict
+
+    if not zones:
+        return []
 
-    return zones.values()
+    # fetch catalog zones concurrently, zone transfers are network bound
+    max_workers = min(MAX_WORKERS, len(zones))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(parse_config_catalog_zone, zone_dict, keys, cwd)
+            for zone_dict in zones.values()
+        ]
+        return [future.result() for future in futures]
 
 
 def get_current_zones(filename: str) -> Dict[str, str]:
     """Get dictionary of current zones and patterns"""
     res = {}
     with contextlib.suppress(FileNotFoundError):  # noqa
-        with open(filename) as fp:
-            for line in fp.readlines():
-                if line.startswith("#"):
-                    continue
-                if match := re.match(r"^add (\S+) (\w+)$", line.rstrip()):
+        with open(filename, buffering=ZONELIST_BUFFER_SIZE) as fp:
+            for line in fp:
+                # comments and other lines fail on the first character
+                if match := ADD_ZONE_RE.match(line):
                     res[match.group(1).lower()] = match.group(2)
     return res
 
 
-def nsd_control(command: str, dry_run: bool = True):
+def get_zone_changes(
+    catalog_zones: List[CatalogZone], current_zone_patterns: Dict[str, str]
+) -> Tuple[Dict[str, str], Dict[str, str], Set[str]]:
+    """Get zones to add and change (with new patterns) and zones to delete"""
+    new_zone_patterns = {zone: cz.pattern for cz in catalog_zones for zone in cz.zones}
+    common_zones = new_zone_patterns.keys() & current_zone_patterns.keys()
+    add_zones = {
+        zone: new_zone_patterns[zone]
+        for zone in new_zone_patterns.keys() - current_zone_patterns.keys()
+    }
+    change_zones = {
+        zone: new_zone_patterns[zone]
+        for zone in common_zones
+        if new_zone_patterns[zone] != current_zone_patterns[zone]
+    }
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for zone in common_zones - change_zones.keys():
+            logger.debug("No changes to zone %s (%s)", zone, new_zone_patterns[zone])
+
+    # only zones not present in any catalog are deleted
+    del_zones = current_zone_patterns.keys() - new_zone_patterns.keys()
+
+    return add_zones, change_zones, del_zones
+
+
+def nsd_control(command: str, dry_run: bool = True, lines: Optional[List[str]] = None):
+    """Run nsd-control command, feeding lines (if any) on stdin"""
     if dry_run:
-        logger.debug("DRY-RUN: nsd-control %s", command)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DRY-RUN: nsd-control %s", command)
+            for line in lines or []:
+                logger.debug("DRY-RUN:   %s", line)
     else:
         logger.debug("EXEC: nsd-control %s", command)
-        os.system(f"nsd-control {command}")
+        try:
+            res = subprocess.run(
+                ["nsd-control", *command.split()],
+                input="".join(f"{line}\n" for line in lines) if lines else None,
+                text=True,
+                check=False,
+            )
+        except OSError as exc:
+            logger.error("nsd-control %s failed (%s)", command, exc)
+            return
+        if res.returncode != 0:
+            logger.error("nsd-control %s failed (%d)", command, res.returncode)
+
+
+def update_zones(
+    add_zones: Dict[str, str],
+    change_zones: Dict[str, str],
+    del_zones: Set[str],
+    dry_run: bool = True,
+) -> None:
+    """Add, change and delete zones using nsd-control"""
+    # add and delete zones in bulk, one nsd-control invocation each
+    if add_zones:
+        lines = [f"{zone} {pattern}" for zone, pattern in add_zones.items()]
+        nsd_control("addzones", dry_run, lines)
+    if del_zones:
+        nsd_control("delzones", dry_run, sorted(del_zones))
+
+    # there is no bulk changezone, run a few nsd-control invocations at a time
+    if change_zones:
+        max_workers = min(NSD_CONTROL_WORKERS, len(change_zones))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(nsd_control, f"changezone {zone} {pattern}", dry_run)
+                for zone, pattern in change_zones.items()
+            ]
+            for future in futures:
+                future.result()
 
 
 def main() -> None:
@@ -122,25 +203,18 @@ def main() -> None:
         sys.exit(-1)
 
     current_zone_patterns = get_current_zones(args.zonelist)
-    current_zones = set(current_zone_patterns.keys())
-    all_new_zones = set()
-
-    for cz in catalog_zones:
-        for zone in cz.zones:
-            if zone not in current_zone_patterns:
-                logger.info("Add zone %s (%s)", zone, cz.pattern)
-                nsd_control(f"addzone {zone} {cz.pattern}", args.dry_run)
-            elif cz.pattern != current_zone_patterns[zone]:
-                logger.info("Update zone %s (%s)", zone, cz.pattern)
-                nsd_control(f"changezone {zone} {cz.pattern}", args.dry_run)
-            else:
-                logger.debug("No changes to zone %s (%s)", zone, cz.pattern)
-            all_new_zones.add(zone)
-
-    del_zones = current_zones - all_new_zones
+    add_zones, change_zones, del_zones = get_zone_changes(
+        catalog_zones, current_zone_patterns
+    )
+
+    for zone, pattern in add_zones.items():
+        logger.info("Add zone %s (%s)", zone, pattern)
+    for zone, pattern in change_zones.items():
+        logger.info("Update zone %s (%s)", zone, pattern)
     for zone in del_zones:
         logger.info("Delete zone %s", zone)
-        nsd_control(f"delzone {zone}", args.dry_run)
+
+    update_zones(add_zones, change_zones, del_zones, args.dry_run)
 
 
 if __name__ == "__main__":
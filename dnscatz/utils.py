@@ -1,23 +1,40 @@
-import re
-from typing import List
+import logging
+from typing import Iterable, List
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+logger = logging.getLogger(__name__)
+
 
 def read_multidicts(filename: str) -> List[dict]:
     """Read multiple YAML dictionaries from file, return list of them"""
+    if not yaml.__with_libyaml__:
+        logger.debug("libyaml not available, using pure-Python YAML parser")
     with open(filename) as fp:
-        return parse_multidicts(fp.read())
+        return parse_multidicts_lines(fp)
 
 
 def parse_multidicts(config: str) -> List[dict]:
     """Parse multiple YAML dictionaries from string, return list of them"""
-    data = ""
-    for line in config.split("\n"):
-        if line.startswith("#") or re.fullmatch(r"^\s+$", line):
+    return parse_multidicts_lines(config.split("\n"))
+
+
+def parse_multidicts_lines(lines: Iterable[str]) -> List[dict]:
+    """Parse multiple YAML dictionaries from lines, return list of them"""
+    chunks = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith(("#", "---")) or line.isspace():
+            # comments, blank lines and explicit document separators
             continue
-        elif re.match(r"^\S", line):
-            data += "\n--- \n"
-        data += line + "\n"
-    res = list(yaml.safe_load_all(data))
+        elif line and not line[0].isspace():
+            chunks.append("\n--- \n")
+        chunks.append(line + "\n")
+    data = "".join(chunks)
+    res = list(yaml.load_all(data, Loader=SafeLoader))
     return res
@@ -5,11 +5,12 @@ containing list of zones
 
 import argparse
 import csv
+import hashlib
 import sys
 import time
 import uuid
 from io import StringIO
-from typing import List, Optional
+from typing import Dict, Iterable, Optional, TextIO
 
 CATZ_VERSION = 2
 
@@ -23,58 +24,86 @@ DEFAULT_SOA_MINIMUM = 0
 
 DEFAULT_TTL = 0
 
+OUTPUT_BUFFER_SIZE = 1024 * 1024
 
-def generate_catalog_zone(
-    origin: str, zones: Optional[List[str]] = None, zonelist: Optional[str] = None
-) -> str:
-    buf = StringIO()
-    serial = int(time.time())
-
-    old_stdout = sys.stdout
-    sys.stdout = buf
-
-    print(
-        " ".join(
-            [
-                origin,
-                str(DEFAULT_TTL),
-                "IN SOA",
-                "invalid.",
-                "invalid.",
-                str(serial),
-                str(DEFAULT_SOA_REFRESH),
-                str(DEFAULT_SOA_RETRY),
-                str(DEFAULT_SOA_EXPIRE),
-                str(DEFAULT_SOA_MINIMUM),
-            ]
-        )
+NAMESPACE_DNS_BYTES = uuid.NAMESPACE_DNS.bytes
+
+
+def get_zone_id(zone: str) -> str:
+    """Get member zone unique id, same as str(uuid.uuid5(uuid.NAMESPACE_DNS, zone))"""
+    digest = hashlib.sha1(NAMESPACE_DNS_BYTES + zone.encode()).hexdigest()
+    # set version (5) and variant (RFC 4122) as uuid.UUID does
+    variant = "89ab"[int(digest[16], 16) & 0x3]
+    return "-".join(
+        [
+            digest[0:8],
+            digest[8:12],
+            "5" + digest[13:16],
+            variant + digest[17:20],
+            digest[20:32],
+        ]
+    )
+
+
+def write_catalog_zone(
+    output: TextIO,
+    origin: str,
+    zones: Optional[Iterable[str]] = None,
+    zonelist: Optional[str] = None,
+    *,
+    serial: Optional[int] = None,
+) -> None:
+    if serial is None:
+        serial = int(time.time())
+
+    write = output.write
+
+    write(
+        f"{origin} {DEFAULT_TTL} IN SOA invalid. invalid. {serial}"
+        f" {DEFAULT_SOA_REFRESH} {DEFAULT_SOA_RETRY}"
+        f" {DEFAULT_SOA_EXPIRE} {DEFAULT_SOA_MINIMUM}\n"
     )
-    print(f"{origin} {DEFAULT_TTL} IN NS invalid.")
-    print(f'version.{origin} {DEFAULT_TTL} IN TXT "{CATZ_VERSION}"')
+    write(f"{origin} {DEFAULT_TTL} IN NS invalid.\n")
+    write(f'version.{origin} {DEFAULT_TTL} IN TXT "{CATZ_VERSION}"\n')
+
+    # member zones (fully qualified, deduplicated) and their groups
+    members: Dict[str, Optional[str]] = {}
 
     for zone in zones or []:
-        if not zone.endswith("."):
-            zone += "."
-        zone_id = uuid.uuid5(uuid.NAMESPACE_DNS, zone)
-        print(f"{zone_id}.zones.{origin} {DEFAULT_TTL} IN PTR {zone}")
+        members.setdefault(zone if zone.endswith(".") else zone + ".", None)
 
     if zonelist:
         with open(zonelist) as csv_file:
-            csv_reader = csv.DictReader(csv_file, fieldnames=["zone", "group"])
-            for row in csv_reader:
-                zone = row["zone"].strip()
-                if not zone.endswith("."):
-                    zone += "."
-                zone_id = uuid.uuid5(uuid.NAMESPACE_DNS, zone)
-                print(f"{zone_id}.zones.{origin} {DEFAULT_TTL} IN PTR {zone}")
-                if row["group"]:
-                    group = row["group"].strip()
-                    print(
-                        f'group.{zone_id}.zones.{origin} {DEFAULT_TTL} IN TXT "{group}"'
-                    )
-
-    sys.stdout = old_stdout
+            for row in csv.reader(csv_file):
+                if not row:
+                    continue
+                zone = row[0].strip()
+                group = row[1].strip() if len(row) > 1 else None
+                members[zone if zone.endswith(".") else zone + "."] = group or None
+
+    # constant record parts and local names for the per-zone loop
+    ptr_infix = f".zones.{origin} {DEFAULT_TTL} IN PTR "
+    group_infix = f".zones.{origin} {DEFAULT_TTL} IN TXT "
+    zone_id_of = get_zone_id
+
+    for zone in sorted(members):
+        zone_id = zone_id_of(zone)
+        write(f"{zone_id}{ptr_infix}{zone}\n")
+        if group := members[zone]:
+            write(f'group.{zone_id}{group_infix}"{group}"\n')
 
+
+def generate_catalog_zone(
+    origin: str,
+    zones: Optional[Iterable[str]] = None,
+    zonelist: Optional[str] = None,
+    *,
+    serial: Optional[int] = None,
+) -> str:
+    buf = StringIO()
+    write_catalog_zone(
+        buf, origin=origin, zones=zones, zonelist=zonelist, serial=serial
+    )
     return buf.getvalue()
 
 
@@ -105,13 +134,11 @@ def main() -> None:
     if not origin.endswith("."):
         origin += "."
 
-    catalog_zone_str = generate_catalog_zone(origin=origin, zonelist=args.zonelist)
-
     if args.output:
-        with open(args.output, "w") as output_file:
-            output_file.write(catalog_zone_str)
+        with open(args.output, "w", buffering=OUTPUT_BUFFER_SIZE) as output_file:
+            write_catalog_zone(output_file, origin=origin, zonelist=args.zonelist)
     else:
-        print(catalog_zone_str)
+        write_catalog_zone(sys.stdout, origin=origin, zonelist=args.zonelist)
 
 
 if __name__ == "__main__":
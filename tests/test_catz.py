@@ -0,0 +1,245 @@
+import os.path
+from pathlib import Path
+from types import SimpleNamespace
+
+import dns.exception
+import dns.message
+import dns.query
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import dns.xfr
+import dns.zone
+import pytest
+
+from dnscatz import catz
+
+DATADIR = Path(os.path.abspath(os.path.dirname(__file__))) / "data"
+
+
+class Answer(list):
+    rrset = SimpleNamespace(ttl=300)
+
+
+@pytest.fixture
+def good_zone():
+    return dns.zone.from_file(str(DATADIR / "good.zone"), origin="test.catz")
+
+
+def mock_resolver(monkeypatch, resolve):
+    monkeypatch.setattr(catz, "get_resolver", lambda: SimpleNamespace(resolve=resolve))
+    monkeypatch.setattr(catz, "_master_cache", {})
+
+
+def mock_soa_timeout(monkeypatch):
+    def udp(query, where, timeout):
+        raise dns.exception.Timeout
+
+    monkeypatch.setattr(dns.query, "udp", udp)
+
+
+def refresh_zone(zone):
+    return catz.axfr(
+        origin="test.catz",
+        master="192.0.2.1",
+        keyname=None,
+        keyalgorithm=None,
+        secret=None,
+        zone=zone,
+    )
+
+
+def test_resolve_master_address():
+    assert catz.resolve_master("192.0.2.1") == "192.0.2.1"
+    assert catz.resolve_master("2001:db8::1") == "2001:db8::1"
+
+
+def test_resolve_master_cached(monkeypatch):
+    queries = []
+
+    def resolve(qname, rdtype):
+        queries.append(qname)
+        return Answer([SimpleNamespace(address="192.0.2.53")])
+
+    mock_resolver(monkeypatch, resolve)
+
+    assert catz.resolve_master("master.example") == "192.0.2.53"
+    assert catz.resolve_master("master.example") == "192.0.2.53"
+    assert queries == ["master.example"]
+
+
+def test_resolve_master_ipv6(monkeypatch):
+    def resolve(qname, rdtype):
+        if rdtype == "A":
+            raise dns.resolver.NoAnswer
+        return Answer([SimpleNamespace(address="2001:db8::53")])
+
+    mock_resolver(monkeypatch, resolve)
+
+    assert catz.resolve_master("master.example") == "2001:db8::53"
+
+
+def test_resolve_master_failed(monkeypatch):
+    def resolve(qname, rdtype):
+        raise dns.resolver.NXDOMAIN
+
+    mock_resolver(monkeypatch, resolve)
+
+    with pytest.raises(catz.CatalogZoneError, match="master.example"):
+        catz.resolve_master("master.example")
+
+
+def test_axfr_incremental(monkeypatch, good_zone):
+    transfers = []
+
+    def inbound_xfr(where, txn_manager, query):
+        assert query.question[0].rdtype == dns.rdatatype.IXFR
+        transfers.append(where)
+        old_soa = query.authority[0]
+        new_soa = dns.rrset.from_rdata(
+            old_soa.name, old_soa.ttl, old_soa[0].replace(serial=old_soa[0].serial + 1)
+        )
+        response = dns.message.make_response(query)
+        response.answer = [
+            new_soa,
+            old_soa,
+            new_soa,
+            dns.rrset.from_text(
+                "new.zones.test.catz.", 0, "IN", "PTR", "example.info."
+            ),
+            new_soa,
+        ]
+        response = dns.message.from_wire(
+            response.to_wire(),
+            xfr=True,
+            origin=txn_manager.origin,
+            one_rr_per_rrset=True,
+        )
+        with dns.xfr.Inbound(
+            txn_manager, dns.rdatatype.IXFR, old_soa[0].serial
+        ) as inbound:
+            assert inbound.process_message(response)
+
+    def xfr(*args, **kwargs):
+        raise AssertionError("AXFR not expected")
+
+    mock_soa_timeout(monkeypatch)
+    monkeypatch.setattr(dns.query, "inbound_xfr", inbound_xfr)
+    monkeypatch.setattr(dns.query, "xfr", xfr)
+
+    serial = catz.get_zone_serial(good_zone)
+    res = refresh_zone(good_zone)
+    assert transfers == ["192.0.2.1"]
+    assert catz.get_zone_serial(res) == serial + 1
+    assert catz.get_catz_zones(res) == {
+        "example.com",
+        "example.net",
+        "example.org",
+        "example.info",
+    }
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        dns.xfr.SerialWentBackwards,
+        dns.xfr.TransferError(dns.rcode.NOTIMP),
+        dns.xfr.TransferError(dns.rcode.REFUSED),
+    ],
+)
+def test_axfr_incremental_fallback(monkeypatch, good_zone, exc):
+    axfr_zone = dns.zone.Zone("test.catz")
+    transfers = []
+
+    def inbound_xfr(where, txn_manager, query):
+        raise exc
+
+    def xfr(where, origin, **kwargs):
+        transfers.append(where)
+        return iter([])
+
+    def from_xfr(xfr):
+        return axfr_zone
+
+    mock_soa_timeout(monkeypatch)
+    monkeypatch.setattr(dns.query, "inbound_xfr", inbound_xfr)
+    monkeypatch.setattr(dns.query, "xfr", xfr)
+    monkeypatch.setattr(dns.zone, "from_xfr", from_xfr)
+
+    assert refresh_zone(good_zone) is axfr_zone
+    assert transfers == ["192.0.2.1"]
+
+
+def test_axfr_unchanged(monkeypatch, good_zone):
+    soa = good_zone.find_rdataset("@", dns.rdatatype.SOA)
+
+    def udp(query, where, timeout):
+        response = dns.message.make_response(query)
+        response.answer.append(
+            dns.rrset.from_rdata_list(query.question[0].name, soa.ttl, soa)
+        )
+        return dns.message.from_wire(response.to_wire())
+
+    def inbound_xfr(*args, **kwargs):
+        raise AssertionError("IXFR not expected")
+
+    monkeypatch.setattr(dns.query, "udp", udp)
+    monkeypatch.setattr(dns.query, "inbound_xfr", inbound_xfr)
+
+    assert refresh_zone(good_zone) is good_zone
+
+
+def test_get_catz_zones_properties():
+    zone = dns.zone.from_text(
+        """
+@ 0 IN SOA invalid. invalid. 1 3600 600 2147483647 0
+@ 0 IN NS invalid.
+version 0 IN TXT "2"
+a.zones 0 IN PTR example.com.
+group.a.zones 0 IN TXT "group1"
+ext.a.zones 0 IN TXT "custom"
+b.zones 0 IN PTR Example.NET.
+c.zones 0 IN PTR sub.test.catz.
+""",
+        origin="test.catz",
+    )
+    assert catz.get_catz_zones(zone) == {
+        "example.com",
+        "example.net",
+        "sub.test.catz",
+    }
+
+
+def test_xfr_catz_zones(monkeypatch, good_zone):
+    rrsets = [
+        dns.rrset.from_rdata_list(name, rdataset.ttl, rdataset)
+        for name, rdataset in good_zone.iterate_rdatasets()
+    ]
+
+    def xfr(where, zone, **kwargs):
+        assert where == "192.0.2.1"
+        yield SimpleNamespace(answer=rrsets[:2])
+        yield SimpleNamespace(answer=rrsets[2:])
+
+    monkeypatch.setattr(dns.query, "xfr", xfr)
+
+    zones = catz.xfr_catz_zones(
+        origin="test.catz",
+        master="192.0.2.1",
+        keyname=None,
+        keyalgorithm=None,
+        secret=None,
+    )
+    assert zones == {"example.com", "example.net", "example.org"}
+
+
+def test_ensure_unique_zones():
+    catalog_zones = [
+        catz.CatalogZone(origin="a.catz", zones={"a.test", "c.test"}),
+        catz.CatalogZone(origin="b.catz", zones={"b.test"}),
+    ]
+    catz.ensure_unique_zones(catalog_zones)
+    catalog_zones.append(catz.CatalogZone(origin="c.catz", zones={"c.test"}))
+    with pytest.raises(catz.InvalidConfigurationError):
+        catz.ensure_unique_zones(catalog_zones)
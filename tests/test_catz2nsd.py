@@ -0,0 +1,125 @@
+import logging
+import subprocess
+from types import SimpleNamespace
+
+from dnscatz import catz2nsd
+from dnscatz.catz import CatalogZone
+
+ZONELIST = (
+    "# NSD zone list\n"
+    "# name pattern\n"
+    "add example.com ns1\n"
+    "add Example.NET ns2\n"
+    "add example.org ns1 \t\n"
+)
+
+
+def test_get_current_zones(tmp_path):
+    filename = tmp_path / "zone.list"
+    filename.write_text(ZONELIST)
+    assert catz2nsd.get_current_zones(filename) == {
+        "example.com": "ns1",
+        "example.net": "ns2",
+        "example.org": "ns1",
+    }
+
+
+def test_get_current_zones_missing(tmp_path):
+    assert catz2nsd.get_current_zones(tmp_path / "zone.list") == {}
+
+
+def test_get_zone_changes():
+    catalog_zones = [
+        CatalogZone(origin="a.catz", zones={"a1.test", "a2.test"}, pattern="ns1"),
+        CatalogZone(origin="b.catz", zones={"b1.test", "b2.test"}, pattern="ns2"),
+    ]
+    current_zone_patterns = {
+        "a1.test": "ns1",
+        "b1.test": "ns1",
+        "b2.test": "ns2",
+        "old.test": "ns1",
+    }
+    add_zones, change_zones, del_zones = catz2nsd.get_zone_changes(
+        catalog_zones, current_zone_patterns
+    )
+    assert add_zones == {"a2.test": "ns1"}
+    assert change_zones == {"b1.test": "ns2"}
+    assert del_zones == {"old.test"}
+
+
+def mock_subprocess_run(monkeypatch, returncode=0):
+    calls = []
+
+    def run(args, input=None, text=False, check=True):
+        calls.append((args, input))
+        return SimpleNamespace(returncode=returncode)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return calls
+
+
+def test_update_zones_add_delete(monkeypatch):
+    calls = mock_subprocess_run(monkeypatch)
+    catz2nsd.update_zones(
+        add_zones={"a1.test": "ns1", "a2.test": "ns2"},
+        change_zones={},
+        del_zones={"old2.test", "old1.test"},
+        dry_run=False,
+    )
+    assert calls == [
+        (["nsd-control", "addzones"], "a1.test ns1\na2.test ns2\n"),
+        (["nsd-control", "delzones"], "old1.test\nold2.test\n"),
+    ]
+
+
+def test_update_zones_failed(monkeypatch, caplog):
+    mock_subprocess_run(monkeypatch, returncode=1)
+    with caplog.at_level(logging.ERROR):
+        catz2nsd.update_zones(
+            add_zones={"a1.test": "ns1"},
+            change_zones={},
+            del_zones=set(),
+            dry_run=False,
+        )
+    assert "nsd-control addzones failed (1)" in caplog.text
+
+
+def test_update_zones_change(monkeypatch):
+    calls = mock_subprocess_run(monkeypatch)
+    change_zones = {f"c{i}.test": "ns2" for i in range(20)}
+    catz2nsd.update_zones(
+        add_zones={}, change_zones=change_zones, del_zones=set(), dry_run=False
+    )
+    assert sorted(args for args, _ in calls) == sorted(
+        ["nsd-control", "changezone", zone, pattern]
+        for zone, pattern in change_zones.items()
+    )
+    assert all(input is None for _, input in calls)
+
+
+def test_update_zones_dry_run(monkeypatch):
+    calls = mock_subprocess_run(monkeypatch)
+    catz2nsd.update_zones(
+        add_zones={"a1.test": "ns1"},
+        change_zones={"c1.test": "ns2"},
+        del_zones={"old.test"},
+        dry_run=True,
+    )
+    assert calls == []
+
+
+def test_update_zones_not_found(monkeypatch, caplog):
+    def run(args, **kwargs):
+        raise FileNotFoundError(2, "No such file or directory", args[0])
+
+    monkeypatch.setattr(subprocess, "run", run)
+    with caplog.at_level(logging.ERROR):
+        catz2nsd.update_zones(
+            add_zones={"a1.test": "ns1"},
+            change_zones={"c1.test": "ns2"},
+            del_zones={"old.test"},
+            dry_run=False,
+        )
+    assert "nsd-control addzones failed" in caplog.text
+    assert "nsd-control delzones failed" in caplog.text
+    assert "nsd-control changezone c1.test ns2 failed" in caplog.text
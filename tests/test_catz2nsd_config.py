@@ -80,10 +80,28 @@ key:
   secret: "b90O5awgKh8zY9Tkc3Yc9lmREgRi0S5JJGJ5JaGF3fw="
 """
 
+CONFIG_NO_ZONES = """
+key:
+  name: key1
+  algorithm: hmac-sha256
+  secret: "b90O5awgKh8zY9Tkc3Yc9lmREgRi0S5JJGJ5JaGF3fw="
+"""
+
 
-def test_config_good():
-    config = parse_multidicts(CONFIG_GOOD)
-    _ = catz2nsd.parse_config(config, cwd=DATADIR)
+@pytest.fixture(scope="module")
+def config_good():
+    return parse_multidicts(CONFIG_GOOD)
+
+
+def test_config_good(config_good):
+    _ = catz2nsd.parse_config(config_good, cwd=DATADIR)
+
+
+def test_config_good_zones(config_good):
+    (catalog_zone,) = catz2nsd.parse_config(config_good, cwd=DATADIR)
+    assert catalog_zone.origin == "test.catz"
+    assert catalog_zone.pattern == "ns1"
+    assert catalog_zone.zones == {"example.com", "example.net", "example.org"}
 
 
 def test_config_bad_1():
@@ -108,3 +126,8 @@ def test_config_bad_zone_dup():
     config = parse_multidicts(CONFIG_BAD_ZONE_DUPE)
     with pytest.raises(InvalidConfigurationError):
         _ = catz2nsd.parse_config(config, cwd=DATADIR)
+
+
+def test_config_no_catalog_zones():
+    config = parse_multidicts(CONFIG_NO_ZONES)
+    assert catz2nsd.parse_config(config, cwd=DATADIR) == []
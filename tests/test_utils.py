@@ -1,4 +1,4 @@
-from dnscatz.utils import parse_multidicts
+from dnscatz.utils import parse_multidicts, read_multidicts
 
 TEST_DATA = """
 section:
@@ -25,3 +25,16 @@ def test_parse_multidicts():
     assert res[2]["other_section"]["value"] == 3
     assert res[3]["other_section"]["value"] == 4
     assert res[4]["section"]["value"] == 5
+
+
+def test_parse_multidicts_separators():
+    res = parse_multidicts("---\n" + TEST_DATA.replace("\n\n", "\n---\n"))
+    assert len(res) == 5
+    assert res[0]["section"]["value"] == 1
+    assert res[4]["section"]["value"] == 5
+
+
+def test_read_multidicts(tmp_path):
+    filename = tmp_path / "test.conf"
+    filename.write_text(TEST_DATA)
+    assert read_multidicts(filename) == parse_multidicts(TEST_DATA)
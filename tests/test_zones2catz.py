@@ -1,3 +1,6 @@
+import uuid
+
+import dns.rdatatype
 import dns.zone
 
 from dnscatz import zones2catz
@@ -14,3 +17,35 @@ def test_zones2catz():
     contents = zones2catz.generate_catalog_zone(origin=origin, zones=ZONES)
     zone = dns.zone.from_text(contents, origin=origin)
     assert str(zone.origin) == origin
+
+
+def test_get_zone_id():
+    for zone in ZONES + ["example.com.", "xn--bcher-kva.example.", "bücher.example."]:
+        assert zones2catz.get_zone_id(zone) == str(uuid.uuid5(uuid.NAMESPACE_DNS, zone))
+
+
+def test_zones2catz_zonelist(tmp_path):
+    origin = "test.catz."
+    zonelist = tmp_path / "zones.txt"
+    zonelist.write_text(
+        "example.org, group2\nexample.com\n\nexample.net,group1\nexample.com.\n"
+    )
+    contents = zones2catz.generate_catalog_zone(origin=origin, zonelist=zonelist)
+    zone = dns.zone.from_text(contents, origin=origin)
+    groups = {
+        str(name): rdataset[0].strings[0].decode()
+        for name, rdataset in zone.iterate_rdatasets(dns.rdatatype.TXT)
+        if str(name).startswith("group.")
+    }
+    assert len(zone.nodes) == 2 + 3 + 2
+    assert sorted(groups.values()) == ["group1", "group2"]
+    targets = [line.split()[-1] for line in contents.splitlines() if " PTR " in line]
+    assert targets == ["example.com.", "example.net.", "example.org."]
+
+
+def test_zones2catz_serial():
+    origin = "test.catz."
+    contents = zones2catz.generate_catalog_zone(origin, iter(ZONES), serial=42)
+    assert contents == zones2catz.generate_catalog_zone(origin, ZONES, serial=42)
+    zone = dns.zone.from_text(contents, origin=origin)
+    assert zone.find_rdataset("@", dns.rdatatype.SOA)[0].serial == 42